@@ -23,11 +23,36 @@ Usage example:
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
+import time
 from typing import Any, AsyncIterator, Dict, Optional, Set
+from urllib.parse import quote
 
 import httpx
 
+from clash_auto_switch.runtime import get_ssl_context
+
+
+# The monitor polls the controller every interval_sec (30s by default), which is
+# far longer than httpx's default 5s keep-alive expiry. Keep idle connections
+# around long enough to be reused across polls instead of reconnecting each time.
+_CONTROLLER_LIMITS = httpx.Limits(
+    max_connections=32,
+    max_keepalive_connections=8,
+    keepalive_expiry=75.0,
+)
+
+@functools.lru_cache(maxsize=1024)
+def _proxy_path(name: str) -> str:
+    """Return the /proxies/:name path with the name percent-encoded.
+
+    Node names often contain spaces, emoji, or characters such as '/' and '#'
+    that would otherwise be misread as URL structure. Names repeat on every
+    poll, so the encoded path is cached.
+    """
+    return "/proxies/" + quote(name, safe="")
+
 
 class ClashClient:
     """Async client for Clash REST API.
@@ -37,8 +62,11 @@ class ClashClient:
     - secret: If set, will add Authorization: Bearer <secret> header.
     - verify_ssl: Whether to verify TLS certificates (for https base_url).
     - timeout: Default request timeout in seconds.
-    - http2: Whether to enable HTTP/2 on the underlying client.
+    - http2: Whether to enable HTTP/2 on the underlying client. Off by default: the
+      controller is usually on loopback and gets one request at a time.
     - proxy: Optional upstream proxy for these API calls (rarely needed).
+    - proxy_cache_ttl: Seconds a get_proxy() result is reused before refetching (0 disables).
+    - max_concurrency: Maximum number of requests in flight at once; streams are not counted.
     """
 
     def __init__(
@@ -48,8 +76,10 @@ class ClashClient:
         secret: Optional[str] = None,
         verify_ssl: bool = True,
         timeout: Optional[float] = 30.0,
-        http2: bool = True,
+        http2: bool = False,
         proxy: Optional[str] = None,
+        proxy_cache_ttl: float = 2.0,
+        max_concurrency: int = 16,
     ) -> None:
         headers: Dict[str, str] = {
             "Accept": "application/json",
@@ -64,10 +94,14 @@ class ClashClient:
             base_url=base_url,
             headers=headers,
             timeout=timeout,
-            verify=verify_ssl,
+            verify=get_ssl_context(verify_ssl),
             http2=http2,
             proxy=proxy,
+            limits=_CONTROLLER_LIMITS,
         )
+        self._proxy_cache_ttl = proxy_cache_ttl
+        self._proxy_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
     # ---------- Lifecycle ----------
     async def aclose(self) -> None:
@@ -89,8 +123,10 @@ class ClashClient:
         scheme: str = "http",
         verify_ssl: bool = True,
         timeout: Optional[float] = 30.0,
-        http2: bool = True,
+        http2: bool = False,
         proxy: Optional[str] = None,
+        proxy_cache_ttl: float = 2.0,
+        max_concurrency: int = 16,
     ) -> "ClashClient":
         """Create client from Clash external-controller string.
 
@@ -108,9 +144,48 @@ class ClashClient:
             timeout=timeout,
             http2=http2,
             proxy=proxy,
+            proxy_cache_ttl=proxy_cache_ttl,
+            max_concurrency=max_concurrency,
         )
 
+    # ---------- Requests ----------
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, waiting for a free slot when max_concurrency are in flight."""
+        async with self._semaphore:
+            return await self._client.request(method, url, **kwargs)
+
     # ---------- Common ----------
+    async def _iter_json_lines(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream newline-delimited JSON objects from a long-lived endpoint.
+
+        Frames raw bytes directly instead of going through aiter_lines(), which
+        decodes every chunk to str and splits it in Python.
+        """
+        async with self._client.stream("GET", path, params=params) as response:
+            response.raise_for_status()
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(b"\n", start)) != -1:
+                    line = bytes(buffer[start:end])
+                    start = end + 1
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                del buffer[:start]
+            # Some implementations may not terminate the last object with a newline
+            if buffer.strip():
+                try:
+                    yield json.loads(bytes(buffer))
+                except json.JSONDecodeError:
+                    pass
+
     async def iter_traffic(self) -> AsyncIterator[Dict[str, Any]]:
         """Stream current traffic stats.
 
@@ -118,20 +193,8 @@ class ClashClient:
         Yields dicts like {"up": <bytes>, "down": <bytes>} every second.
         Docs: https://clash.gitbook.io/doc/restful-api/common
         """
-        async with self._client.stream("GET", "/traffic") as response:
-            response.raise_for_status()
-            # One JSON object per line
-            async for line in response.aiter_lines():
-                if not line:
-                    continue
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    # Some implementations may stream without newlines; fallback to chunks
-                    try:
-                        yield json.loads(line.strip())
-                    except json.JSONDecodeError:
-                        continue
+        async for item in self._iter_json_lines("/traffic"):
+            yield item
 
     async def iter_logs(self, level: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
         """Stream realtime logs.
@@ -144,18 +207,8 @@ class ClashClient:
         if level:
             params["level"] = level
 
-        async with self._client.stream("GET", "/logs", params=params) as response:
-            response.raise_for_status()
-            async for line in response.aiter_lines():
-                if not line:
-                    continue
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    try:
-                        yield json.loads(line.strip())
-                    except json.JSONDecodeError:
-                        continue
+        async for item in self._iter_json_lines("/logs", params=params):
+            yield item
 
     # ---------- Proxies ----------
     async def get_proxies(self) -> Dict[str, Any]:
@@ -164,7 +217,7 @@ class ClashClient:
         GET /proxies
         Docs: https://clash.gitbook.io/doc/restful-api/proxies
         """
-        response = await self._client.get("/proxies")
+        response = await self._request("GET", "/proxies")
         response.raise_for_status()
         return response.json()
 
@@ -172,11 +225,27 @@ class ClashClient:
         """Get single proxy info by name (case-sensitive).
 
         GET /proxies/:name
+        Results are reused for proxy_cache_ttl seconds.
         Docs: https://clash.gitbook.io/doc/restful-api/proxies
         """
-        response = await self._client.get(f"/proxies/{name}")
+        now = time.monotonic()
+        cached = self._proxy_cache.get(name)
+        if cached is not None and now - cached[0] < self._proxy_cache_ttl:
+            return cached[1]
+
+        response = await self._request("GET", _proxy_path(name))
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        if self._proxy_cache_ttl > 0:
+            self._proxy_cache[name] = (now, result)
+        return result
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached get_proxy() results for one proxy, or all when name is None."""
+        if name is None:
+            self._proxy_cache.clear()
+        else:
+            self._proxy_cache.pop(name, None)
 
     async def get_proxy_delay(self, name: str, url: str, timeout_ms: int) -> Dict[str, Any]:
         """Get proxy delay test result.
@@ -185,7 +254,7 @@ class ClashClient:
         Docs: https://clash.gitbook.io/doc/restful-api/proxies
         """
         params = {"url": url, "timeout": timeout_ms}
-        response = await self._client.get(f"/proxies/{name}/delay", params=params)
+        response = await self._request("GET", _proxy_path(name) + "/delay", params=params)
         response.raise_for_status()
         return response.json()
 
@@ -196,9 +265,10 @@ class ClashClient:
         Returns 204 No Content on success.
         Docs: https://clash.gitbook.io/doc/restful-api/proxies
         """
-        response = await self._client.put(
-            f"/proxies/{selector_name}", json={"name": proxy_name}
+        response = await self._request(
+            "PUT", _proxy_path(selector_name), json={"name": proxy_name}
         )
+        self.invalidate(selector_name)
         # Some implementations may return 204 (expected) or 200 with body
         if response.status_code not in (200, 204):
             response.raise_for_status()
@@ -210,7 +280,7 @@ class ClashClient:
         GET /configs
         Docs: https://clash.gitbook.io/doc/restful-api/config
         """
-        response = await self._client.get("/configs")
+        response = await self._request("GET", "/configs")
         response.raise_for_status()
         return response.json()
 
@@ -222,7 +292,7 @@ class ClashClient:
         Returns 204 No Content.
         Docs: https://clash.gitbook.io/doc/restful-api/config
         """
-        response = await self._client.patch("/configs", json=config_update)
+        response = await self._request("PATCH", "/configs", json=config_update)
         if response.status_code != 204:
             response.raise_for_status()
 
@@ -236,7 +306,7 @@ class ClashClient:
         if force is not None:
             params["force"] = str(force).lower()
 
-        response = await self._client.put("/configs", params=params, json={"path": path})
+        response = await self._request("PUT", "/configs", params=params, json={"path": path})
         # Some implementations return 200 with JSON; others may be empty
         if response.status_code >= 400:
             response.raise_for_status()
@@ -251,7 +321,7 @@ class ClashClient:
         GET /rules
         Docs: https://clash.gitbook.io/doc/restful-api/config
         """
-        response = await self._client.get("/rules")
+        response = await self._request("GET", "/rules")
         response.raise_for_status()
         return response.json()
 
@@ -5,11 +5,16 @@ Command line entry point and argument parsing for clash_auto_switch.
 import argparse
 import asyncio
 import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
 
 from clash_auto_switch.monitor import (
     load_app_config,
     run_multiple_tasks,
 )
+from clash_auto_switch.runtime import get_loop_factory
 from clash_auto_switch.storage import NodeHistoryStorage
 from clash_auto_switch.project import (
     get_config_file_path,
@@ -70,6 +75,27 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def setup_logging() -> QueueListener:
+    """Route the package's log output through a queue drained by a background thread.
+
+    Monitoring tasks log from the event loop; handing records to a queue keeps
+    terminal writes off the loop. The caller must stop the returned listener to
+    flush pending records.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+
+    logger = logging.getLogger("clash_auto_switch")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
+    listener.start()
+    return listener
+
+
 def show_all_statistics() -> None:
     """Display statistics for all services with data."""
     storage = NodeHistoryStorage()
@@ -80,8 +106,10 @@ def show_all_statistics() -> None:
         print("运行监控任务后将自动记录节点性能数据。")
         return
     
-    print(f"\n🚀 总共有 {summary['total_services']} 个服务的统计数据")
-    print("=" * 120)
+    # Collect the whole report and write it in one go
+    lines = []
+    lines.append(f"\n🚀 总共有 {summary['total_services']} 个服务的统计数据")
+    lines.append("=" * 120)
     
     for service in summary['services']:
         proxy_group = service['proxy_group']
@@ -90,15 +118,15 @@ def show_all_statistics() -> None:
         total_checks = service['total_checks']
         success_rate = service['success_rate']
         
-        print(f"\n📋 [{proxy_group:<15}] {service_name}")
-        print(f"    节点数: {total_nodes:3d} | 检测次数: {total_checks:5d} | 成功率: {success_rate:6.2%}")
+        lines.append(f"\n📋 [{proxy_group:<15}] {service_name}")
+        lines.append(f"    节点数: {total_nodes:3d} | 检测次数: {total_checks:5d} | 成功率: {success_rate:6.2%}")
         
         # Get detailed statistics to show top 5 most reliable nodes
         detailed_stats = storage.get_statistics(proxy_group, service_name)
         rankings = detailed_stats.get('reliability_rankings', [])
         
         if rankings:
-            print("    🏆 前5个最可靠节点:")
+            lines.append("    🏆 前5个最可靠节点:")
             for i, ranking in enumerate(rankings[:5], 1):
                 node_name = ranking['node']
                 reliability = ranking['reliability_score']
@@ -106,15 +134,16 @@ def show_all_statistics() -> None:
                 total_node_checks = ranking['total_checks']
                 status_emoji = "✅" if ranking['current_status'] == "available" else "❌"
                 
-                print(f"       {i}. {node_name:<20} | "
-                      f"可靠性: {reliability:.3f} | "
-                      f"成功率: {node_success_rate:6.2%} | "
-                      f"检测: {total_node_checks:3d}次 {status_emoji}")
+                lines.append(f"       {i}. {node_name:<20} | "
+                             f"可靠性: {reliability:.3f} | "
+                             f"成功率: {node_success_rate:6.2%} | "
+                             f"检测: {total_node_checks:3d}次 {status_emoji}")
         else:
-            print("    🏆 前5个最可靠节点: 暂无数据")
+            lines.append("    🏆 前5个最可靠节点: 暂无数据")
     
-    print("=" * 120)
-    print("\n💡 使用 'clash_auto_switch --show-stats-detail PROXY_GROUP SERVICE' 查看详细统计")
+    lines.append("=" * 120)
+    lines.append("\n💡 使用 'clash_auto_switch --show-stats-detail PROXY_GROUP SERVICE' 查看详细统计")
+    print("\n".join(lines))
 
 
 def show_detailed_statistics(proxy_group_name: str, service_name: str) -> None:
@@ -122,39 +151,41 @@ def show_detailed_statistics(proxy_group_name: str, service_name: str) -> None:
     storage = NodeHistoryStorage()
     stats = storage.get_statistics(proxy_group_name, service_name)
     
-    print(f"\n=== 详细统计信息: {proxy_group_name} / {service_name} ===")
-    print(f"总节点数: {stats['total_nodes']}")
-    print(f"总检测次数: {stats['total_checks']}")
-    print(f"整体成功率: {stats['success_rate']:.2%}")
+    lines = []
+    lines.append(f"\n=== 详细统计信息: {proxy_group_name} / {service_name} ===")
+    lines.append(f"总节点数: {stats['total_nodes']}")
+    lines.append(f"总检测次数: {stats['total_checks']}")
+    lines.append(f"整体成功率: {stats['success_rate']:.2%}")
     
     if stats['most_reliable_node']:
         score = stats['highest_reliability_score']
-        print(f"最可靠节点: {stats['most_reliable_node']} (可靠性评分: {score:.3f})")
+        lines.append(f"最可靠节点: {stats['most_reliable_node']} (可靠性评分: {score:.3f})")
     
     if stats['last_successful_node']:
-        print(f"最近成功节点: {stats['last_successful_node']}")
+        lines.append(f"最近成功节点: {stats['last_successful_node']}")
     
     # Show reliability rankings
     rankings = stats.get('reliability_rankings', [])
     if rankings:
-        print("\n📊 节点可靠性排名:")
+        lines.append("\n📊 节点可靠性排名:")
         for i, ranking in enumerate(rankings[:10], 1):  # Show top 10
             status_emoji = "✅" if ranking['current_status'] == "available" else "❌"
-            print(f"  {i:2d}. {ranking['node']:<20} "
-                  f"可靠性: {ranking['reliability_score']:.3f} "
-                  f"成功率: {ranking['success_rate']:.2%} "
-                  f"检测次数: {ranking['total_checks']:3d} "
-                  f"{status_emoji}")
+            lines.append(f"  {i:2d}. {ranking['node']:<20} "
+                         f"可靠性: {ranking['reliability_score']:.3f} "
+                         f"成功率: {ranking['success_rate']:.2%} "
+                         f"检测次数: {ranking['total_checks']:3d} "
+                         f"{status_emoji}")
     
-    print("\n📈 详细统计:")
+    lines.append("\n📈 详细统计:")
     for node, node_stats in stats.get('node_stats', {}).items():
         reliability = node_stats.get('reliability_score', 0.0)
         success_rate = node_stats['success_rate']
         status_emoji = "✅" if node_stats['current_status'] == "available" else "❌"
-        print(f"  {node}: "
-              f"可靠性评分 {reliability:.3f} | "
-              f"成功率 {success_rate:.2%} ({node_stats['successful']}/{node_stats['total']}) | "
-              f"检测次数 {node_stats.get('total_checks', 0)} {status_emoji}")
+        lines.append(f"  {node}: "
+                     f"可靠性评分 {reliability:.3f} | "
+                     f"成功率 {success_rate:.2%} ({node_stats['successful']}/{node_stats['total']}) | "
+                     f"检测次数 {node_stats.get('total_checks', 0)} {status_emoji}")
+    print("\n".join(lines))
 
 
 def generate_config_template() -> str:
@@ -226,10 +257,14 @@ def main() -> None:
     if args.once:
         config.monitoring.once = True
     
+    config_file = get_config_file_path()
+    print(f"使用配置文件: {config_file}")
+    listener = setup_logging()
     try:
-        config_file = get_config_file_path()
-        print(f"使用配置文件: {config_file}")
-        asyncio.run(run_multiple_tasks(config))
+        try:
+            asyncio.run(run_multiple_tasks(config), loop_factory=get_loop_factory())
+        finally:
+            listener.stop()
     except KeyboardInterrupt:
         print("收到 Ctrl-C，退出。")
         raise SystemExit(130)
@@ -1,5 +1,9 @@
 import asyncio
-from typing import Optional, Tuple, List
+import contextlib
+import logging
+import random
+import signal
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 import httpx
@@ -8,6 +12,8 @@ from clash_auto_switch.clash_api import ClashClient
 from clash_auto_switch.storage import NodeHistoryStorage
 from clash_auto_switch.project import load_config
 from clash_auto_switch.unlock_tester import (
+    UnlockItem,
+    create_http_client,
     check_bilibili_china_mainland,
     check_bilibili_hk_mc_tw,
     check_chatgpt_combined,
@@ -34,6 +40,8 @@ class MonitoringConfig:
     interval_sec: float = 30.0
     max_rotations: int = 0
     once: bool = False
+    probe_timeout_sec: float = 20.0
+    probe_budget_sec: float = 45.0
 
 
 @dataclass
@@ -52,6 +60,75 @@ class AppConfig:
     tasks: List[TaskConfig]
 
 
+logger = logging.getLogger(__name__)
+
+
+ProbeHandler = Callable[
+    [Optional[str], Optional[httpx.AsyncClient]], Awaitable[Tuple[bool, str]]
+]
+
+
+# Normalize common aliases
+_SERVICE_ALIASES: Dict[str, str] = {
+    "bilibili_cn": "bilibili_mainland",
+    "bilibili_mainland": "bilibili_mainland",
+    "bilibili_hk": "bilibili_hk_mc_tw",
+    "bilibili_hk_mc_tw": "bilibili_hk_mc_tw",
+    "chatgpt": "chatgpt",
+    "openai": "chatgpt",
+    "gemini": "gemini",
+    "youtube": "youtube_premium",
+    "youtube_premium": "youtube_premium",
+    "bahamut": "bahamut_anime",
+    "bahamut_anime": "bahamut_anime",
+    "netflix": "netflix",
+    "disney": "disney_plus",
+    "disney+": "disney_plus",
+    "disney_plus": "disney_plus",
+    "prime": "prime_video",
+    "prime_video": "prime_video",
+    "amazon_prime": "prime_video",
+}
+
+
+def _format_unlock_item(item: UnlockItem) -> str:
+    region = f" ({item.region})" if item.region else ""
+    return f"{item.name}: {item.status}{region}"
+
+
+def _single_check(
+    check: Callable[[Optional[str], Optional[httpx.AsyncClient]], Awaitable[UnlockItem]],
+) -> ProbeHandler:
+    """Wrap a check returning one UnlockItem into a probe handler."""
+    async def handler(
+        proxy_url: Optional[str], client: Optional[httpx.AsyncClient]
+    ) -> Tuple[bool, str]:
+        result = await check(proxy_url, client)
+        return result.status == "Yes", _format_unlock_item(result)
+    return handler
+
+
+async def _probe_chatgpt(
+    proxy_url: Optional[str], client: Optional[httpx.AsyncClient]
+) -> Tuple[bool, str]:
+    items = await check_chatgpt_combined(proxy_url, client)
+    unlocked = any(item.status == "Yes" for item in items)
+    return unlocked, ", ".join(_format_unlock_item(item) for item in items)
+
+
+_PROBE_HANDLERS: Dict[str, ProbeHandler] = {
+    "bilibili_mainland": _single_check(check_bilibili_china_mainland),
+    "bilibili_hk_mc_tw": _single_check(check_bilibili_hk_mc_tw),
+    "chatgpt": _probe_chatgpt,
+    "gemini": _single_check(check_gemini),
+    "youtube_premium": _single_check(check_youtube_premium),
+    "bahamut_anime": _single_check(check_bahamut_anime),
+    "netflix": _single_check(check_netflix),
+    "disney_plus": _single_check(check_disney_plus),
+    "prime_video": _single_check(check_prime_video),
+}
+
+
 def load_app_config() -> Optional[AppConfig]:
     """Load configuration from the standard location."""
     data = load_config()
@@ -76,7 +153,9 @@ def parse_config_data(data: dict) -> AppConfig:
     monitoring_config = MonitoringConfig(
         interval_sec=monitoring_data.get("interval_sec", 30.0),
         max_rotations=monitoring_data.get("max_rotations", 0),
-        once=monitoring_data.get("once", False)
+        once=monitoring_data.get("once", False),
+        probe_timeout_sec=monitoring_data.get("probe_timeout_sec", 20.0),
+        probe_budget_sec=monitoring_data.get("probe_budget_sec", 45.0)
     )
     
     tasks = []
@@ -98,95 +177,60 @@ def parse_config_data(data: dict) -> AppConfig:
 async def probe_service(
     service_name: str,
     proxy_url: Optional[str],
+    client: Optional[httpx.AsyncClient] = None,
+    timeout: Optional[float] = None,
 ) -> Tuple[bool, str]:
     """Return (is_unlocked, human_status).
 
     The service is considered unlocked only when status == "Yes".
     For ChatGPT, unlocked if either iOS/Web returns Yes.
+    When client is given, the checks reuse its connections instead of opening their own.
+    A probe running longer than timeout seconds counts as not unlocked.
     """
-
     key = service_name.strip().lower()
-    # Normalize common aliases
-    alias = {
-        "bilibili_cn": "bilibili_mainland",
-        "bilibili_mainland": "bilibili_mainland",
-        "bilibili_hk": "bilibili_hk_mc_tw",
-        "bilibili_hk_mc_tw": "bilibili_hk_mc_tw",
-        "chatgpt": "chatgpt",
-        "openai": "chatgpt",
-        "gemini": "gemini",
-        "youtube": "youtube_premium",
-        "youtube_premium": "youtube_premium",
-        "bahamut": "bahamut_anime",
-        "bahamut_anime": "bahamut_anime",
-        "netflix": "netflix",
-        "disney": "disney_plus",
-        "disney+": "disney_plus",
-        "disney_plus": "disney_plus",
-        "prime": "prime_video",
-        "prime_video": "prime_video",
-        "amazon_prime": "prime_video",
-    }
-
-    norm = alias.get(key, key)
-
-    if norm == "bilibili_mainland":
-        result = await check_bilibili_china_mainland(proxy_url)
-        return result.status == "Yes", f"{result.name}: {result.status}"
-    if norm == "bilibili_hk_mc_tw":
-        result = await check_bilibili_hk_mc_tw(proxy_url)
-        return result.status == "Yes", f"{result.name}: {result.status}"
-    if norm == "chatgpt":
-        items = await check_chatgpt_combined(proxy_url)
-        unlocked = any(item.status == "Yes" for item in items)
-        status_text = ", ".join(f"{i.name}: {i.status}{(' (' + i.region + ')') if i.region else ''}" for i in items)
-        return unlocked, status_text
-    if norm == "gemini":
-        result = await check_gemini(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-    if norm == "youtube_premium":
-        result = await check_youtube_premium(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-    if norm == "bahamut_anime":
-        result = await check_bahamut_anime(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-    if norm == "netflix":
-        result = await check_netflix(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-    if norm == "disney_plus":
-        result = await check_disney_plus(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-    if norm == "prime_video":
-        result = await check_prime_video(proxy_url)
-        region = f" ({result.region})" if result.region else ""
-        return result.status == "Yes", f"{result.name}: {result.status}{region}"
-
-    return False, f"未知服务: {service_name}"
+    handler = _PROBE_HANDLERS.get(_SERVICE_ALIASES.get(key, key))
+    if handler is None:
+        return False, f"未知服务: {service_name}"
+    try:
+        async with asyncio.timeout(timeout):
+            return await handler(proxy_url, client)
+    except TimeoutError:
+        return False, f"检测超时 ({timeout:g}s)"
 
 
 async def probe_service_multi(
     service_name: str,
     proxy_url: Optional[str],
-    count: int = 3
+    client: Optional[httpx.AsyncClient] = None,
+    timeout: Optional[float] = None,
+    count: int = 3,
+    budget: Optional[float] = None,
 ) -> Tuple[bool, str]:
     """连续多次检测服务，任意失败则返回失败。
     
     Args:
         service_name: 服务名称
         proxy_url: 代理URL
+        client: 复用的HTTP客户端，为空时每次检测单独创建
+        timeout: 单次检测的超时时间（秒），为空时不限制
         count: 检测次数，默认3次
+        budget: 全部检测（含间隔等待）的总时限（秒），为空时不限制
         
     Returns:
         Tuple[bool, str]: (是否全部成功, 状态描述)
     """
+    loop = asyncio.get_running_loop()
+    deadline = None if budget is None else loop.time() + budget
     for i in range(count):
+        # 单次超时不超过总时限的剩余部分
+        attempt_timeout = timeout
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False, f"第{i+1}次检测前已超出总时限 ({budget:g}s)"
+            attempt_timeout = remaining if timeout is None else min(timeout, remaining)
         try:
-            is_unlocked, status = await probe_service(service_name, proxy_url)
+            is_unlocked, status = await probe_service(service_name, proxy_url, client, attempt_timeout)
             if not is_unlocked:
                 return False, f"第{i+1}次检测失败: {status}"
             # 如果不是最后一次检测，等待1秒
@@ -224,7 +268,17 @@ async def select_next_proxy_in_group(
     Raises:
         RuntimeError: If no eligible proxy found
     """
-    group_info = await client.get_proxy(proxy_group_name)
+    # One /proxies snapshot carries both the group's members and every node's state
+    try:
+        proxy_states = (await client.get_proxies()).get("proxies") or {}
+    except httpx.HTTPError as e:
+        # If cannot fetch details, assume the nodes might work and include them
+        logger.warning("获取代理状态失败, 假定所有节点可用: %s", e)
+        proxy_states = {}
+
+    group_info = proxy_states.get(proxy_group_name)
+    if not isinstance(group_info, dict):
+        group_info = await client.get_proxy(proxy_group_name)
     candidates = group_info.get("all") or []
     if not isinstance(candidates, list) or not candidates:
         raise ValueError(
@@ -233,18 +287,11 @@ async def select_next_proxy_in_group(
 
     current = group_info.get("now")
     
-    # Filter candidates: check if alive and remove explicitly dead ones
-    alive_candidates = []
-    for candidate in candidates:
-        try:
-            candidate_info = await client.get_proxy(candidate)
-            # Skip if explicitly dead
-            if candidate_info.get("alive") is False:
-                continue
-            alive_candidates.append(candidate)
-        except httpx.HTTPError:
-            # If cannot fetch details, assume it might work and include it
-            alive_candidates.append(candidate)
+    # Filter candidates: remove explicitly dead ones
+    alive_candidates = [
+        candidate for candidate in candidates
+        if (proxy_states.get(candidate) or {}).get("alive") is not False
+    ]
     
     if not alive_candidates:
         raise RuntimeError(
@@ -252,123 +299,189 @@ async def select_next_proxy_in_group(
         )
     
     # Use storage's intelligent recommendation system
-    recommended = storage.get_recommended_node(
+    recommendation = storage.get_recommended_node_with_score(
         proxy_group=proxy_group_name,
         service_name=service_name,
         available_nodes=alive_candidates,
         current_node=current
     )
     
-    if recommended is None:
+    if recommendation is None:
         raise RuntimeError(
             f"No suitable proxy found in group '{proxy_group_name}'."
         )
+    recommended, selected_score = recommendation
     
     # Switch to the recommended proxy
     await client.select_proxy(proxy_group_name, recommended)
     
-    # Get reliability info for logging
-    reliable_nodes = storage.get_nodes_by_reliability(
-        proxy_group_name, service_name, min_reliability=0.0, limit=len(candidates)
-    )
-    reliability_map = {node['node']: node['reliability_score'] for node in reliable_nodes}
-    selected_score = reliability_map.get(recommended, 0.0)
-    
-    print(f"    └── 推荐节点: {recommended:<20} | 可靠性评分: {selected_score:.3f}")
+    logger.info("    └── 推荐节点: %-20s | 可靠性评分: %.3f", recommended, selected_score)
     
     return recommended
 
 
+async def wait_or_stop(stop_event: Optional[asyncio.Event], timeout: float) -> bool:
+    """Wait up to timeout seconds; return True as soon as stop_event is set."""
+    if stop_event is None:
+        await asyncio.sleep(timeout)
+        return False
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout)
+    except TimeoutError:
+        return False
+    return True
+
+
+def jittered(interval: float) -> float:
+    """Spread interval by ±10% so parallel tasks do not probe through the proxy in lockstep."""
+    return interval * random.uniform(0.9, 1.1)
+
+
 async def run_task(
     task: TaskConfig,
+    clash: ClashClient,
     clash_config: ClashConfig,
     monitoring_config: MonitoringConfig,
     storage: NodeHistoryStorage,
+    stop_event: Optional[asyncio.Event] = None,
 ) -> None:
-    """Run a single monitoring task."""
+    """Run a single monitoring task until it finishes or stop_event is set."""
     task_name = task.service_name
     proxy_group_name = task.proxy_group_name
     service_name = task.service_name
     
-    # Calculate padding for consistent alignment
-    max_task_name_width = 15  # Fixed width for task name column
-    task_name_padded = f"{task_name:<{max_task_name_width}}"
+    # Pad once for consistent alignment; the name is constant for the task's lifetime
+    task_name_padded = task_name.ljust(15)  # Fixed width for task name column
     
-    print(f"[{task_name_padded}] 开始监控: 代理组={proxy_group_name}, 服务={service_name}")
+    logger.info("[%s] 开始监控: 代理组=%s, 服务=%s", task_name_padded, proxy_group_name, service_name)
     
-    # Clash controller client
-    async with ClashClient.from_external_controller(clash_config.controller, secret=clash_config.secret) as clash:
-        rotations = 0
-        is_new_proxy = True
-        
-        while True:
-            # Get current node before testing
-            current_node = None
-            try:
-                group_state = await clash.get_proxy(proxy_group_name)
-                current_node = group_state.get("now")
-            except Exception:
-                pass
-
-            _probe = probe_service_multi if is_new_proxy else probe_service
+    rotations = 0
+    # A node the task has not confirmed yet gets the repeated probe_service_multi check
+    is_new_proxy = True
+    # The node the group currently routes through, as last read from the controller
+    current_node: Optional[str] = None
+    # Probe connections are pooled per node: tunnels opened through Clash stay
+    # on the node that was selected when they were established, so the client
+    # is replaced whenever the group switches to another node.
+    probe_client = create_http_client(clash_config.http_proxy)
 
+    try:
+        while True:
+            # One /proxies snapshot per iteration gives both the group's selection,
+            # so switches made elsewhere (another task, the Clash UI) are picked up,
+            # and the selected node's health as seen by Clash
             try:
-                ok, status_text = await _probe(
-                    service_name, clash_config.http_proxy
-                )
-                is_new_proxy = False
-            except Exception as e:
-                ok, status_text = False, f"检测异常: {e}"
-
-            # Record node status in persistent storage
-            if isinstance(current_node, str) and current_node:
-                storage.record_node_status(
-                    node_name=current_node,
-                    service_name=service_name,
-                    proxy_group=proxy_group_name,
-                    is_available=ok
-                )
+                proxy_states = (await clash.get_proxies()).get("proxies") or {}
+            except (httpx.HTTPError, ValueError):
+                proxy_states = {}
+            now = (proxy_states.get(proxy_group_name) or {}).get("now")
+            if isinstance(now, str) and now and now != current_node:
+                if current_node is not None:
+                    # Pooled tunnels still lead to the previous node
+                    await probe_client.aclose()
+                    probe_client = create_http_client(clash_config.http_proxy)
+                    is_new_proxy = True
+                current_node = now
+
+            if current_node and (proxy_states.get(current_node) or {}).get("alive") is False:
+                # Clash's own health check already failed the node; skip the external probe
+                ok, status_text = False, "Clash 报告节点不可用"
+            else:
+                if is_new_proxy:
+                    probe = probe_service_multi(
+                        service_name, clash_config.http_proxy, probe_client,
+                        monitoring_config.probe_timeout_sec,
+                        budget=monitoring_config.probe_budget_sec,
+                    )
+                else:
+                    probe = probe_service(
+                        service_name, clash_config.http_proxy, probe_client,
+                        monitoring_config.probe_timeout_sec,
+                    )
+
+                try:
+                    ok, status_text = await probe
+                    is_new_proxy = False
+                except Exception as e:
+                    # A failing check counts as unavailable; it must never end the task
+                    ok, status_text = False, f"检测异常: {type(e).__name__}"
+
+            # Node status updates for this iteration, recorded in storage in one batch
+            node_updates = []
+            if current_node:
+                node_updates.append({
+                    "node_name": current_node,
+                    "service_name": service_name,
+                    "proxy_group": proxy_group_name,
+                    "is_available": ok,
+                })
 
             # Format current node display
             node_display = current_node if current_node else "未知"
-            node_display_padded = f"{node_display:<20}"  # Fixed width for node column
 
             if ok:
+                storage.record_node_status_batch(node_updates)
                 if rotations != 0:
                     rotations = 0
-                print(f"[{task_name_padded}] ✔ 服务可用   | {status_text:<35} | 节点: {node_display_padded}")
+                logger.info("[%s] ✔ 服务可用   | %-35s | 节点: %-20s", task_name_padded, status_text, node_display)
                 if monitoring_config.once:
                     return
-                await asyncio.sleep(monitoring_config.interval_sec)
+                if await wait_or_stop(stop_event, jittered(monitoring_config.interval_sec)):
+                    return
                 continue
 
-            print(f"[{task_name_padded}] ✖ 服务不可用 | {status_text:<35} | 节点: {node_display_padded}")
+            logger.info("[%s] ✖ 服务不可用 | %-35s | 节点: %-20s", task_name_padded, status_text, node_display)
 
             try:
                 next_proxy = await select_next_proxy_in_group(
                     clash, proxy_group_name, service_name, storage
                 )
+                current_node = next_proxy
+                is_new_proxy = True
                 rotations += 1
-                next_proxy_display = f"{next_proxy:<20}"
-                print(f"[{task_name_padded}] ➤ 切换代理   | {proxy_group_name} -> {next_proxy_display}")
-                
+                await probe_client.aclose()
+                probe_client = create_http_client(clash_config.http_proxy)
+                logger.info("[%s] ➤ 切换代理   | %s -> %-20s", task_name_padded, proxy_group_name, next_proxy)
+            
                 # Record the switch in storage
-                storage.record_node_status(
-                    node_name=next_proxy,
-                    service_name=service_name,
-                    proxy_group=proxy_group_name,
-                    is_available=False  # We haven't tested the new node yet
-                )
+                node_updates.append({
+                    "node_name": next_proxy,
+                    "service_name": service_name,
+                    "proxy_group": proxy_group_name,
+                    "is_available": False,  # We haven't tested the new node yet
+                })
             except Exception as e:
-                print(f"[{task_name_padded}] ⚠ 切换失败   | {str(e):<35}")
+                storage.record_node_status_batch(node_updates)
+                logger.info("[%s] ⚠ 切换失败   | %-35s", task_name_padded, e)
                 # 等待后继续监控
-                await asyncio.sleep(monitoring_config.interval_sec)
+                if await wait_or_stop(stop_event, jittered(monitoring_config.interval_sec)):
+                    return
                 continue
 
+            storage.record_node_status_batch(node_updates)
+
             if monitoring_config.max_rotations > 0 and rotations >= monitoring_config.max_rotations:
-                print(f"[{task_name_padded}] ⏸ 暂停监控   | 已达到最大切换次数 ({monitoring_config.max_rotations})")
+                logger.info("[%s] ⏸ 暂停监控   | 已达到最大切换次数 (%d)", task_name_padded, monitoring_config.max_rotations)
                 rotations = 0
-                await asyncio.sleep(max(monitoring_config.interval_sec, 30.0))
+                if await wait_or_stop(stop_event, max(monitoring_config.interval_sec, 30.0)):
+                    return
+    finally:
+        await probe_client.aclose()
+
+
+async def _flush_storage_periodically(storage: NodeHistoryStorage, interval: float) -> None:
+    """Write recorded node statuses to the data file every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(storage.flush)
+
+
+def _log_task_failure(task: asyncio.Task) -> None:
+    """Report a monitoring task that ended with an exception as soon as it happens."""
+    if not task.cancelled() and task.exception() is not None:
+        exc = task.exception()
+        logger.error("[%-15s] 监控任务异常退出: %s", task.get_name(), exc,
+                     exc_info=(type(exc), exc, exc.__traceback__))
 
 
 async def run_multiple_tasks(config: AppConfig) -> None:
@@ -380,33 +493,59 @@ async def run_multiple_tasks(config: AppConfig) -> None:
     enabled_tasks = [task for task in config.tasks if task.enabled]
     
     if not enabled_tasks:
-        print("没有启用的监控任务。")
+        logger.info("没有启用的监控任务。")
         return
     
-    print(f"🚀 启动 {len(enabled_tasks)} 个监控任务:")
-    print("=" * 80)
+    logger.info("🚀 启动 %d 个监控任务:", len(enabled_tasks))
+    logger.info("=" * 80)
     for task in enabled_tasks:
-        task_name_padded = f"{task.service_name:<15}"
-        print(f"  📋 [{task_name_padded}] 代理组: {task.proxy_group_name:<20} | 服务: {task.service_name}")
-    print("=" * 80)
-    print()
+        logger.info("  📋 [%-15s] 代理组: %-20s | 服务: %s", task.service_name, task.proxy_group_name, task.service_name)
+    logger.info("=" * 80)
+    logger.info("")
     
-    # Create tasks for concurrent execution
-    tasks = []
-    for task_config in enabled_tasks:
-        task = asyncio.create_task(
-            run_task(task_config, config.clash, config.monitoring, storage),
-            name=task_config.service_name
-        )
-        tasks.append(task)
+    # Stop on SIGINT/SIGTERM without waiting out the current interval
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    handled_signals = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Not supported by the Windows event loop; Ctrl-C falls back to KeyboardInterrupt there
+        with contextlib.suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(sig, stop_event.set)
+            handled_signals.append(sig)
     
-    try:
-        # Wait for all tasks to complete (which should be never in monitor mode)
-        await asyncio.gather(*tasks)
-    except Exception as e:
-        print(f"监控任务异常: {e}")
-        # Cancel all tasks
-        for task in tasks:
-            if not task.done():
-                task.cancel()
-        raise
+    # One controller client for all tasks so its connection pool and request limit are shared
+    async with ClashClient.from_external_controller(config.clash.controller, secret=config.clash.secret) as clash:
+        # Create tasks for concurrent execution
+        tasks = []
+        for task_config in enabled_tasks:
+            task = asyncio.create_task(
+                run_task(task_config, clash, config.clash, config.monitoring, storage, stop_event),
+                name=task_config.service_name
+            )
+            task.add_done_callback(_log_task_failure)
+            tasks.append(task)
+    
+        # A task that fails is reported on its own and does not cancel the others
+        monitor = asyncio.gather(*tasks, return_exceptions=True)
+        stop_waiter = asyncio.create_task(stop_event.wait())
+        flusher = asyncio.create_task(
+            _flush_storage_periodically(storage, config.monitoring.interval_sec * 5)
+        )
+        try:
+            # Wait for all tasks to complete (which should be never in monitor mode) or a stop request
+            await asyncio.wait({monitor, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if stop_event.is_set():
+                logger.info("收到退出信号，停止监控。")
+                # Tasks between checks return on their own; interrupt probes still in flight
+                monitor.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await monitor
+            else:
+                await monitor
+        finally:
+            stop_waiter.cancel()
+            flusher.cancel()
+            for sig in handled_signals:
+                loop.remove_signal_handler(sig)
+            # Write whatever was recorded since the last periodic flush
+            storage.flush()
@@ -1,5 +1,6 @@
 import os
 import json
+import functools
 from typing import Dict
 from pathlib import Path
 
@@ -7,8 +8,12 @@ from pathlib import Path
 app_name = "clash-auto-switch"
 
 
+@functools.cache
 def get_data_directory() -> Path:
-    """Get the appropriate data directory for the current OS."""
+    """Get the appropriate data directory for the current OS.
+
+    Computed on first use and reused for the rest of the process.
+    """
     if os.name == 'nt':  # Windows
         app_data = os.environ.get('APPDATA', os.path.expanduser('~'))
         data_dir = Path(app_data) / app_name
@@ -37,12 +42,11 @@ def get_config_file_path() -> Path:
 def load_config() -> Dict:
     """Load configuration from the standard config file location."""
     config_file = get_config_file_path()
-    if not config_file.exists():
-        return {}
-
     try:
         with config_file.open("r", encoding="utf-8") as f:
             return json.load(f)
+    except FileNotFoundError:
+        return {}
     except (json.JSONDecodeError, IOError) as e:
         print(f"警告: 配置文件读取失败 ({config_file}): {e}")
         return {}
@@ -0,0 +1,39 @@
+"""
+Runtime helpers shared by the monitor and the standalone unlock tester.
+
+Only the standard library and httpx are imported here, so the module can be
+used from anywhere in the package, and from unlock_tester run as a plain
+script, without pulling in the rest of the package.
+"""
+
+import asyncio
+import ssl
+import threading
+from typing import Callable, Dict, Optional
+
+import httpx
+
+
+def get_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Return uvloop's loop factory when it is installed, else None for the default loop."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+# Building an SSLContext loads the CA bundle, which is expensive. Clients sharing
+# the same verify setting reuse one context for the lifetime of the process.
+_SSL_CONTEXTS: Dict[bool, ssl.SSLContext] = {}
+_SSL_CONTEXTS_LOCK = threading.Lock()
+
+
+def get_ssl_context(verify: bool) -> ssl.SSLContext:
+    """Return the shared SSL context for the given verify setting."""
+    with _SSL_CONTEXTS_LOCK:
+        context = _SSL_CONTEXTS.get(verify)
+        if context is None:
+            context = httpx.create_ssl_context(verify=verify)
+            _SSL_CONTEXTS[verify] = context
+        return context
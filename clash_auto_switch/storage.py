@@ -2,17 +2,34 @@
 Persistent storage for node switching history and failure tracking.
 """
 
+import atexit
 import json
+import logging
+import os
 import time
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 import threading
+import weakref
 
 from .project import get_data_file_path
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Storages with possibly pending records; held weakly so registering does not keep them alive
+_open_storages: "weakref.WeakSet[NodeHistoryStorage]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_storages():
+    """Last resort for pending records when the owner exits without flushing."""
+    for storage in list(_open_storages):
+        storage.flush()
+
+
+@dataclass(slots=True)
 class NodeRecord:
     """Record of a node's status at a specific time."""
     node_name: str
@@ -25,27 +42,62 @@ class NodeRecord:
     total_checks: int = 0  # total number of checks performed
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {
+            'node_name': self.node_name,
+            'service_name': self.service_name,
+            'proxy_group': self.proxy_group,
+            'last_available_time': self.last_available_time,
+            'last_check_time': self.last_check_time,
+            'status': self.status,
+            'reliability_score': self.reliability_score,
+            'total_checks': self.total_checks,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> "NodeRecord":
-        # Handle backward compatibility for existing records
-        if 'reliability_score' not in data:
-            data['reliability_score'] = 0.0
-        if 'total_checks' not in data:
-            data['total_checks'] = 0
-        return cls(**data)
+        # Older records may lack reliability_score and total_checks
+        return cls(
+            data['node_name'],
+            data['service_name'],
+            data['proxy_group'],
+            data['last_available_time'],
+            data['last_check_time'],
+            data['status'],
+            data.get('reliability_score', 0.0),
+            data.get('total_checks', 0),
+        )
 
 
 class NodeHistoryStorage:
-    """Manages persistent storage of node switching history."""
+    """Manages persistent storage of node switching history.
+
+    The data file is read once and kept in memory. Recorded statuses only
+    mark the data dirty; call flush() to write them to the data file.
+    """
     
     def __init__(self):
         self._lock = threading.RLock()
+        # Serializes file writes so an older snapshot can never overwrite a newer one;
+        # held without self._lock so recording is not blocked behind disk I/O
+        self._write_lock = threading.Lock()
         self._data_file = get_data_file_path()
         self._data_file.parent.mkdir(parents=True, exist_ok=True)
+        self._data: Optional[Dict[str, List[Dict]]] = None
+        self._dirty = False
+        # Per record key, node name -> that node's record in self._data; built on demand
+        self._index: Dict[str, Dict[str, Dict]] = {}
+        # Bumped on every change to the data; get_statistics results are cached per version
+        self._data_version = 0
+        self._stats_cache: Dict[Tuple[str, str], Tuple[int, Dict]] = {}
+        _open_storages.add(self)
     
     def _load_data(self) -> Dict[str, List[Dict]]:
+        """Return the in-memory data, reading the storage file on first use."""
+        if self._data is None:
+            self._data = self._read_data_file()
+        return self._data
+    
+    def _read_data_file(self) -> Dict[str, List[Dict]]:
         """Load data from storage file."""
         if not self._data_file.exists():
             return {}
@@ -57,13 +109,34 @@ class NodeHistoryStorage:
             # If file is corrupted, start fresh
             return {}
     
-    def _save_data(self, data: Dict[str, List[Dict]]):
-        """Save data to storage file."""
+    def _replace_data(self, data: Dict[str, List[Dict]]):
+        """Swap in a new in-memory data set; call flush() to write it."""
+        self._data = data
+        self._index = {}
+        self._data_version += 1
+        self._dirty = True
+
+    @staticmethod
+    def _serialize(data: Dict[str, List[Dict]]) -> str:
+        # Compact on purpose; export_data writes the indented form for people to read
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    def _write_file(self, payload: str) -> bool:
+        """Write serialized data to the storage file; return False if it could not be saved."""
+        # Write a sibling file and swap it in, so a crash mid-write never leaves a truncated file
+        tmp_file = self._data_file.with_name(self._data_file.name + '.tmp')
         try:
-            with open(self._data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                # Make the contents durable before the rename, or a power loss can
+                # leave the renamed file empty
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self._data_file)
+            return True
         except IOError as e:
-            print(f"警告: 无法保存节点历史数据: {e}")
+            logger.warning("警告: 无法保存节点历史数据: %s", e)
+            return False
     
     def _cleanup_old_records(self, data: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
         """Remove records older than 1 month. Only runs if file is large."""
@@ -88,6 +161,16 @@ class NodeHistoryStorage:
         """Generate a key for storing records."""
         return f"{proxy_group}#{service}"
     
+    def _node_index(self, data: Dict[str, List[Dict]], key: str) -> Dict[str, Dict]:
+        """Map node names to their records under key, keeping the first record per node."""
+        index = self._index.get(key)
+        if index is None:
+            index = {}
+            for record_dict in data.get(key, []):
+                index.setdefault(record_dict.get('node_name'), record_dict)
+            self._index[key] = index
+        return index
+    
     def _calculate_reliability_score(
         self, 
         current_score: float, 
@@ -145,61 +228,109 @@ class NodeHistoryStorage:
         check_time: Optional[float] = None
     ):
         """Record the status of a node for a specific service."""
+        self.record_node_status_batch([{
+            "node_name": node_name,
+            "service_name": service_name,
+            "proxy_group": proxy_group,
+            "is_available": is_available,
+            "check_time": check_time,
+        }])
+
+    def record_node_status_batch(self, entries: List[Dict]):
+        """Record several node statuses in the in-memory data.
+
+        Each entry holds the keyword arguments of record_node_status.
+        Entries are applied in order and written out by the next flush().
+        """
+        if not entries:
+            return
+
+        with self._lock:
+            data = self._load_data()
+            for entry in entries:
+                self._apply_node_status(data, **entry)
+            self._dirty = True
+            self._data_version += 1
+
+    def flush(self):
+        """Write recorded statuses to the data file if any are pending.
+
+        The data is serialized under the lock and written after releasing it, so
+        records made meanwhile (e.g. on the event loop while this runs in a worker
+        thread) do not wait for the disk. The whole in-memory copy is written, so
+        a data file removed by another process (--clear-stats while monitoring)
+        is recreated with everything this instance has loaded.
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = self._serialize(self._data)
+                self._dirty = False
+            if not self._write_file(payload):
+                # Keep the records pending for the next flush
+                with self._lock:
+                    self._dirty = True
+
+    def _apply_node_status(
+        self,
+        data: Dict[str, List[Dict]],
+        node_name: str,
+        service_name: str,
+        proxy_group: str,
+        is_available: bool,
+        check_time: Optional[float] = None
+    ):
+        """Update the in-memory data with one node status."""
         if check_time is None:
             check_time = time.time()
+
+        key = self._get_record_key(proxy_group, service_name)
+        if key not in data:
+            data[key] = []
         
-        with self._lock:
-            data = self._load_data()
-            
-            key = self._get_record_key(proxy_group, service_name)
-            if key not in data:
-                data[key] = []
+        # Find existing record for this node or create new one
+        node_index = self._node_index(data, key)
+        existing_record = node_index.get(node_name)
+        
+        if existing_record:
+            # Calculate time since last check for reliability scoring
+            time_since_last = check_time - existing_record.get('last_check_time', check_time)
+            current_score = existing_record.get('reliability_score', 0.0)
+            total_checks = existing_record.get('total_checks', 0)
             
-            # Find existing record for this node or create new one
-            existing_record = None
-            for i, record_dict in enumerate(data[key]):
-                if record_dict.get('node_name') == node_name:
-                    existing_record = record_dict
-                    break
+            # Calculate new reliability score
+            new_score = self._calculate_reliability_score(
+                current_score=current_score,
+                total_checks=total_checks,
+                is_success=is_available,
+                time_since_last_check=time_since_last
+            )
             
-            if existing_record:
-                # Calculate time since last check for reliability scoring
-                time_since_last = check_time - existing_record.get('last_check_time', check_time)
-                current_score = existing_record.get('reliability_score', 0.0)
-                total_checks = existing_record.get('total_checks', 0)
-                
-                # Calculate new reliability score
-                new_score = self._calculate_reliability_score(
-                    current_score=current_score,
-                    total_checks=total_checks,
-                    is_success=is_available,
-                    time_since_last_check=time_since_last
-                )
-                
-                # Update existing record
-                existing_record['last_check_time'] = check_time
-                existing_record['status'] = "available" if is_available else "failed"
-                existing_record['reliability_score'] = new_score
-                existing_record['total_checks'] = total_checks + 1
-                if is_available:
-                    existing_record['last_available_time'] = check_time
-            else:
-                # Create new record with initial reliability score
-                initial_score = 0.5 if is_available else 0.1  # Start optimistic if first check succeeds
-                
-                record = NodeRecord(
-                    node_name=node_name,
-                    service_name=service_name,
-                    proxy_group=proxy_group,
-                    last_available_time=check_time if is_available else None,
-                    last_check_time=check_time,
-                    status="available" if is_available else "failed",
-                    reliability_score=initial_score,
-                    total_checks=1
-                )
-                data[key].append(record.to_dict())
+            # Update existing record
+            existing_record['last_check_time'] = check_time
+            existing_record['status'] = "available" if is_available else "failed"
+            existing_record['reliability_score'] = new_score
+            existing_record['total_checks'] = total_checks + 1
+            if is_available:
+                existing_record['last_available_time'] = check_time
+        else:
+            # Create new record with initial reliability score
+            initial_score = 0.5 if is_available else 0.1  # Start optimistic if first check succeeds
             
-            self._save_data(data)
+            record = NodeRecord(
+                node_name=node_name,
+                service_name=service_name,
+                proxy_group=proxy_group,
+                last_available_time=check_time if is_available else None,
+                last_check_time=check_time,
+                status="available" if is_available else "failed",
+                reliability_score=initial_score,
+                total_checks=1
+            )
+            record_dict = record.to_dict()
+            data[key].append(record_dict)
+            node_index[node_name] = record_dict
     
     def get_node_history(
         self, 
@@ -221,7 +352,7 @@ class NodeHistoryStorage:
                     try:
                         record = NodeRecord.from_dict(record_dict)
                         records.append(record)
-                    except (TypeError, ValueError):
+                    except (KeyError, TypeError, ValueError):
                         # Skip malformed records
                         continue
             
@@ -243,8 +374,8 @@ class NodeHistoryStorage:
             services = []
             for key in data.keys():
                 # Parse key format: "proxy_group#service_name"
-                if '#' in key:
-                    proxy_group, service_name = key.split('#', 1)
+                proxy_group, sep, service_name = key.partition('#')
+                if sep:
                     stats = self.get_statistics(proxy_group, service_name)
                     if stats['total_nodes'] > 0:  # Only include services with data
                         services.append({
@@ -266,7 +397,21 @@ class NodeHistoryStorage:
             }
 
     def get_statistics(self, proxy_group: str, service_name: str) -> Dict:
-        """Get statistics for the proxy group and service."""
+        """Get statistics for the proxy group and service.
+
+        Results are reused until the data changes; treat them as read-only.
+        """
+        with self._lock:
+            cache_key = (proxy_group, service_name)
+            cached = self._stats_cache.get(cache_key)
+            if cached is not None and cached[0] == self._data_version:
+                return cached[1]
+            stats = self._compute_statistics(proxy_group, service_name)
+            self._stats_cache[cache_key] = (self._data_version, stats)
+            return stats
+
+    def _compute_statistics(self, proxy_group: str, service_name: str) -> Dict:
+        """Build the statistics returned by get_statistics."""
         records = self.get_node_history(proxy_group, service_name)
         
         if not records:
@@ -280,8 +425,9 @@ class NodeHistoryStorage:
                 "reliability_rankings": []
             }
         
-        # Group records by node to get the latest data for each
+        # Group records by node in one pass: latest record plus record/success counts
         node_latest = {}
+        node_counts: Dict[str, List[int]] = {}
         total_checks = 0
         successful_checks = 0
         last_successful = None
@@ -289,9 +435,12 @@ class NodeHistoryStorage:
         for record in records:
             node = record.node_name
             total_checks += 1
+            counts = node_counts.setdefault(node, [0, 0])
+            counts[0] += 1
             
             if record.status == "available":
                 successful_checks += 1
+                counts[1] += 1
                 if (last_successful is None or 
                     record.last_check_time > last_successful[1]):
                     last_successful = (node, record.last_check_time)
@@ -306,14 +455,14 @@ class NodeHistoryStorage:
         reliability_rankings = []
         
         for node, latest_record in node_latest.items():
-            # Count historical success/failure for this node
-            node_records = [r for r in records if r.node_name == node]
-            successful = sum(1 for r in node_records if r.status == "available")
+            # Historical success/failure for this node
+            total, successful = node_counts[node]
+            success_rate = successful / total
             
             node_stats[node] = {
-                "total": len(node_records),
+                "total": total,
                 "successful": successful,
-                "success_rate": successful / len(node_records) if len(node_records) > 0 else 0.0,
+                "success_rate": success_rate,
                 "reliability_score": latest_record.reliability_score,
                 "total_checks": latest_record.total_checks,
                 "last_check": latest_record.last_check_time,
@@ -324,7 +473,7 @@ class NodeHistoryStorage:
             reliability_rankings.append({
                 "node": node,
                 "reliability_score": latest_record.reliability_score,
-                "success_rate": successful / len(node_records) if len(node_records) > 0 else 0.0,
+                "success_rate": success_rate,
                 "total_checks": latest_record.total_checks,
                 "current_status": latest_record.status
             })
@@ -385,70 +534,107 @@ class NodeHistoryStorage:
         Returns:
             Recommended node name, or None if no suitable node found
         """
-        # Get reliability rankings
-        reliable_nodes = self.get_nodes_by_reliability(
-            proxy_group, service_name, min_reliability=0.0, limit=len(available_nodes)
+        recommended = self.get_recommended_node_with_score(
+            proxy_group, service_name, available_nodes, current_node
         )
+        return recommended[0] if recommended else None
+
+    def _score_node(self, reliability_score: float, success_rate: float, total_checks: int) -> float:
+        """Combine a node's history into the ranking score used for recommendations."""
+        # Combine reliability score with success rate for better ranking
+        # Weight: 70% reliability score + 30% success rate
+        combined_score = (0.7 * reliability_score) + (0.3 * success_rate)
+        
+        # Confidence boost should be based on both data volume AND performance
+        # Only give boost if the node is performing well (success_rate > 0.5)
+        if success_rate > 0.5 and total_checks >= 5:
+            # Scale confidence boost with both success rate and data volume
+            data_confidence = min(total_checks / 50.0, 1.0)  # 0 to 1 based on checks
+            performance_factor = (success_rate - 0.5) * 2  # 0 to 1 based on success above 50%
+            confidence_boost = data_confidence * performance_factor * 0.1  # Max 10% boost
+        else:
+            # Penalize nodes with poor performance or insufficient data
+            confidence_boost = 0.0
+        
+        return combined_score + confidence_boost
+
+    def get_recommended_node_with_score(
+        self, 
+        proxy_group: str, 
+        service_name: str, 
+        available_nodes: List[str],
+        current_node: Optional[str] = None
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Same as get_recommended_node, but also return the node's reliability score.
+        
+        Returns:
+            (node name, reliability score), or None if no suitable node found.
+            Nodes without history report a reliability score of 0.0.
+        """
+        wanted = set(available_nodes)
+        with self._lock:
+            records = self._load_data().get(self._get_record_key(proxy_group, service_name), [])
         
-        # Create reliability map
-        reliability_map = {node['node']: node for node in reliable_nodes}
+        # Single pass over the group's records: per node the check count,
+        # successful count and latest record, only for the nodes asked about
+        history: Dict[str, Tuple[int, int, Dict]] = {}
+        for record in records:
+            node = record.get('node_name')
+            if node not in wanted:
+                continue
+            seen, successful, latest = history.get(node, (0, 0, record))
+            if record.get('last_check_time', 0) > latest.get('last_check_time', 0):
+                latest = record
+            history[node] = (seen + 1, successful + (record.get('status') == "available"), latest)
         
         # Calculate scores for all available nodes
         candidates = []
         for index, node in enumerate(available_nodes):
-            node_info = reliability_map.get(node)
+            node_info = history.get(node)
             if node_info:
                 # Existing node with reliability data
-                reliability_score = node_info['reliability_score']
-                success_rate = node_info['success_rate']
-                total_checks = node_info['total_checks']
-                
-                # Combine reliability score with success rate for better ranking
-                # Weight: 70% reliability score + 30% success rate
-                combined_score = (0.7 * reliability_score) + (0.3 * success_rate)
-                
-                # Confidence boost should be based on both data volume AND performance
-                # Only give boost if the node is performing well (success_rate > 0.5)
-                if success_rate > 0.5 and total_checks >= 5:
-                    # Scale confidence boost with both success rate and data volume
-                    data_confidence = min(total_checks / 50.0, 1.0)  # 0 to 1 based on checks
-                    performance_factor = (success_rate - 0.5) * 2  # 0 to 1 based on success above 50%
-                    confidence_boost = data_confidence * performance_factor * 0.1  # Max 10% boost
-                else:
-                    # Penalize nodes with poor performance or insufficient data
-                    confidence_boost = 0.0
-                
-                final_score = combined_score + confidence_boost
+                seen, successful, latest = node_info
+                reliability_score = latest.get('reliability_score', 0.0)
+                final_score = self._score_node(
+                    reliability_score, successful / seen, latest.get('total_checks', 0)
+                )
             else:
                 # New node without history - give it a moderate score to try it
+                reliability_score = 0.0
                 final_score = 0.3  # Neutral score for exploration
                 
-            # Include original index to preserve order when scores are equal
-            candidates.append((node, final_score, index))
+            # Negated score first so plain tuple order ranks highest first; the
+            # original index breaks ties and keeps node names out of the comparison
+            candidates.append((-final_score, index, node, reliability_score))
         
         if not candidates:
             return None
             
         # Sort by score (highest first), then by original index for stability
         # This preserves the original proxy group order when scores are equal
-        candidates.sort(key=lambda x: (-x[1], x[2]))
+        candidates.sort()
         
         # Prefer nodes that are not the current one
-        for node, score, index in candidates:
+        for neg_score, index, node, reliability_score in candidates:
             if node != current_node:
-                return node
+                return node, reliability_score
                 
         # If all candidates are the current node, return the best one anyway
-        return candidates[0][0] if candidates else None
+        return (candidates[0][2], candidates[0][3]) if candidates else None
     
     def startup_cleanup(self):
         """Perform one-time cleanup at startup if needed."""
         with self._lock:
             data = self._load_data()
             cleaned_data = self._cleanup_old_records(data)
-            if cleaned_data != data:  # Only save if data changed
-                self._save_data(cleaned_data)
-                print(f"已清理过期数据，数据文件: {self._data_file}")
+            changed = cleaned_data != data
+            if changed:
+                self._replace_data(cleaned_data)
+        # Written outside self._lock: flush takes the write lock first
+        if changed:
+            self.flush()
+            logger.info("已清理过期数据，数据文件: %s", self._data_file)
     
     def export_data(self, output_file: Optional[str] = None) -> str:
         """Export all data to a JSON file for backup/analysis."""
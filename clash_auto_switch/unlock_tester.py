@@ -1,13 +1,26 @@
 import asyncio
+import functools
+import json
 import re
+import time
 import argparse
+from contextlib import asynccontextmanager
 from datetime import datetime
+from urllib.parse import urlsplit
 import httpx
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple
+
+try:
+    from clash_auto_switch.runtime import get_loop_factory, get_ssl_context
+except ModuleNotFoundError:
+    # 以脚本方式直接运行时包不在导入路径上，从同目录导入
+    from runtime import get_loop_factory, get_ssl_context
 
 
 # 定义解锁测试项目的结构
 class UnlockItem:
+    __slots__ = ("name", "status", "region", "check_time")
+
     def __init__(self, name: str, status: str, region: Optional[str] = None, check_time: Optional[str] = None):
         self.name = name
         self.status = status
@@ -22,20 +35,61 @@ class UnlockItem:
             "check_time": self.check_time,
         }
 
+# 最近一次格式化的 (整秒时间戳, 时间字符串)；字符串精度为秒，同一秒内直接复用
+_local_date_cache: Tuple[int, str] = (-1, "")
+
 # 获取当前本地时间字符串
 def get_local_date_string() -> str:
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    global _local_date_cache
+    second = int(time.time())
+    if _local_date_cache[0] != second:
+        _local_date_cache = (second, datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S"))
+    return _local_date_cache[1]
+
+# A-Z 对应的区域指示符号，两个拼在一起即为国旗emoji
+_REGIONAL_INDICATORS = tuple(chr(0x1F1E6 + i) for i in range(26))
 
-# 将国家代码转换为对应的emoji
+# 将国家代码转换为对应的emoji；地区种类有限，结果直接缓存
+@functools.lru_cache(maxsize=512)
 def country_code_to_emoji(country_code: str) -> str:
-    country_code = country_code.upper()
     if len(country_code) < 2:
         return ""
+    c1, c2 = country_code[0].upper(), country_code[1].upper()
+    if not ('A' <= c1 <= 'Z' and 'A' <= c2 <= 'Z'):
+        return ""
     
-    c1 = 0x1F1E6 + ord(country_code[0]) - ord('A')
-    c2 = 0x1F1E6 + ord(country_code[1]) - ord('A')
-    
-    return chr(c1) + chr(c2)
+    return _REGIONAL_INDICATORS[ord(c1) - 65] + _REGIONAL_INDICATORS[ord(c2) - 65]
+
+
+# 连接池上限，避免长时间运行时连接无限增长
+# 空闲连接保留60秒，覆盖监控默认的检测间隔，使相邻两次检测复用同一连接而无需重新握手。
+# 经代理建立的隧道固定在建立时所选的节点上，因此监控在代理组切换节点（包括外部切换）后
+# 会重建检测客户端，不会沿用旧节点的连接
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0)
+# 单个请求的超时：连接5秒，读取10秒，写入和等待连接池各5秒
+HTTP_TIMEOUT = httpx.Timeout(connect=5.0, read=10.0, write=5.0, pool=5.0)
+# 单项检测（可能包含多次请求和重试）的总时限，避免一个卡住的服务拖住全部结果
+CHECK_DEADLINE = 15.0
+
+# 从页面中提取地区等信息的正则，模块加载时编译一次
+_CF_TRACE_LOC_RE = re.compile(r'^loc=([^\r\n]+)', re.M)
+_GEMINI_REGION_RE = re.compile(r',2,1,200,"([A-Z]{3})"')
+_YT_REGION_RE = re.compile(r'id="country-code"[^>]*>([^<]+)<')
+_BAHAMUT_GEO_RE = re.compile(r'data-geo="([^"]+)"')
+_DISNEY_REGION_RE = re.compile(r'"region"\s*:\s*"([^"]+)"')
+_DISNEY_COUNTRY_RE = re.compile(r'"countryCode"\s*:\s*"([^"]+)"')
+_DISNEY_SUPPORTED_RE = re.compile(r'"inSupportedLocation"\s*:\s*(true|false)')
+
+# 取出 prefix 之后、下一个 suffix 之前的文本；用于前缀是固定字面量的场景，无需正则
+def _extract_between(body: str, prefix: str, suffix: str = '"') -> Optional[str]:
+    start = body.find(prefix)
+    if start < 0:
+        return None
+    start += len(prefix)
+    end = body.find(suffix, start)
+    if end < 0:
+        return None
+    return body[start:end] or None
 
 # 创建新的HTTP客户端
 def create_http_client(proxy: Optional[str] = None, custom_headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
@@ -48,107 +102,112 @@ def create_http_client(proxy: Optional[str] = None, custom_headers: Optional[Dic
     return httpx.AsyncClient(
         proxy=proxy,
         headers=default_headers,
-        timeout=30.0,
-        verify=False,
+        timeout=HTTP_TIMEOUT,
+        limits=HTTP_LIMITS,
+        # 检测请求不校验证书；SSLContext 创建开销较大，与 Clash API 客户端共用同一份缓存
+        verify=get_ssl_context(False),
         http2=True
     )
 
+# 复用调用方传入的客户端；未传入时创建临时客户端并在结束后关闭
+@asynccontextmanager
+async def use_http_client(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[httpx.AsyncClient]:
+    if client is not None:
+        yield client
+        return
+    async with create_http_client(proxy) as owned_client:
+        yield owned_client
+
+# 哔哩哔哩播放接口返回码与检测结果的对应关系，其余返回码均视为失败
+_BILIBILI_STATUS = {0: "Yes", -10403: "No"}
+
+# 两个哔哩哔哩检测只有请求地址和名称不同
+async def _check_bilibili(client: httpx.AsyncClient, url: str, name: str) -> UnlockItem:
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        body = response.json()
+        # 返回体不是预期的对象（或 code 不是整数）时视为失败
+        code = body.get("code") if isinstance(body, dict) else None
+        status = _BILIBILI_STATUS.get(code, "Failed") if isinstance(code, int) else "Failed"
+    except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
+        status = "Failed"
+
+    return UnlockItem(name, status)
+
 # 测试哔哩哔哩中国大陆
-async def check_bilibili_china_mainland(proxy: Optional[str] = None) -> UnlockItem:
+async def check_bilibili_china_mainland(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://api.bilibili.com/pgc/player/web/playurl?avid=82846771&qn=0&type=&otype=json&ep_id=307247&fourk=1&fnver=0&fnval=16&module=bangumi"
-    async with create_http_client(proxy) as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            body = response.json()
-            code = body.get("code")
-            if code == 0:
-                status = "Yes"
-            elif code == -10403:
-                status = "No"
-            else:
-                status = "Failed"
-        except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
-            status = "Failed"
-
-    return UnlockItem("哔哩哔哩大陆", status)
+    async with use_http_client(proxy, client) as client:
+        return await _check_bilibili(client, url, "哔哩哔哩大陆")
 
 # 测试哔哩哔哩港澳台
-async def check_bilibili_hk_mc_tw(proxy: Optional[str] = None) -> UnlockItem:
+async def check_bilibili_hk_mc_tw(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://api.bilibili.com/pgc/player/web/playurl?avid=18281381&cid=29892777&qn=0&type=&otype=json&ep_id=183799&fourk=1&fnver=0&fnval=16&module=bangumi"
-    async with create_http_client(proxy) as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            body = response.json()
-            code = body.get("code")
-            if code == 0:
-                status = "Yes"
-            elif code == -10403:
-                status = "No"
-            else:
-                status = "Failed"
-        except (httpx.RequestError, httpx.HTTPStatusError, ValueError):
-            status = "Failed"
-            
-    return UnlockItem("哔哩哔哩港澳台", status)
-
-# 合并的ChatGPT检测功能
-async def check_chatgpt_combined(proxy: Optional[str] = None) -> List[UnlockItem]:
-    async with create_http_client(proxy) as client:
-        results = []
-        region = None
-        
-        # 1. 获取国家代码
-        try:
-            response_country = await client.get("https://chat.openai.com/cdn-cgi/trace")
-            if response_country.status_code == 200:
-                trace_data = {line.split('=')[0]: line.split('=')[1] for line in response_country.text.splitlines() if '=' in line}
-                loc = trace_data.get("loc")
-                if loc:
-                    emoji = country_code_to_emoji(loc)
-                    region = f"{emoji}{loc}"
-        except httpx.RequestError:
-            pass
-
-        # 2. 测试 ChatGPT iOS
-        ios_status = "Failed"
-        try:
-            response_ios = await client.get("https://ios.chat.openai.com/")
-            response_ios.raise_for_status()
-            body_lower = response_ios.text.lower()
-            if "you may be connected to a disallowed isp" in body_lower:
-                ios_status = "Disallowed ISP"
-            elif "request is not allowed. please try again later." in body_lower:
-                ios_status = "Yes"
-            elif "sorry, you have been blocked" in body_lower:
-                ios_status = "Blocked"
-        except (httpx.RequestError, httpx.HTTPStatusError):
-            pass
-
-        results.append(UnlockItem("ChatGPT iOS", ios_status, region=region))
-
-        # 3. 测试 ChatGPT Web
-        web_status = "Failed"
-        try:
-            response_web = await client.get("https://api.openai.com/compliance/cookie_requirements")
-            response_web.raise_for_status()
-            body_lower = response_web.text.lower()
-            if "unsupported_country" in body_lower:
-                web_status = "Unsupported Country/Region"
-            else:
-                web_status = "Yes"
-        except (httpx.RequestError, httpx.HTTPStatusError):
-            pass
+    async with use_http_client(proxy, client) as client:
+        return await _check_bilibili(client, url, "哔哩哔哩港澳台")
 
-        results.append(UnlockItem("ChatGPT Web", web_status, region=region))
-        
-    return results
+# 获取ChatGPT所在地区
+async def _fetch_chatgpt_region(client: httpx.AsyncClient) -> Optional[str]:
+    try:
+        response_country = await client.get("https://chat.openai.com/cdn-cgi/trace")
+        if response_country.status_code == 200:
+            # trace 为 key=value 逐行格式，只需要 loc 这一行
+            match = _CF_TRACE_LOC_RE.search(response_country.text)
+            if match:
+                loc = match.group(1)
+                emoji = country_code_to_emoji(loc)
+                return f"{emoji}{loc}"
+    except httpx.RequestError:
+        pass
+    return None
+
+# 测试 ChatGPT iOS
+async def _check_chatgpt_ios_status(client: httpx.AsyncClient) -> str:
+    try:
+        response_ios = await client.get("https://ios.chat.openai.com/")
+        response_ios.raise_for_status()
+        body_lower = response_ios.text.lower()
+        if "you may be connected to a disallowed isp" in body_lower:
+            return "Disallowed ISP"
+        elif "request is not allowed. please try again later." in body_lower:
+            return "Yes"
+        elif "sorry, you have been blocked" in body_lower:
+            return "Blocked"
+    except (httpx.RequestError, httpx.HTTPStatusError):
+        pass
+    return "Failed"
+
+# 测试 ChatGPT Web
+async def _check_chatgpt_web_status(client: httpx.AsyncClient) -> str:
+    try:
+        response_web = await client.get("https://api.openai.com/compliance/cookie_requirements")
+        response_web.raise_for_status()
+        body_lower = response_web.text.lower()
+        if "unsupported_country" in body_lower:
+            return "Unsupported Country/Region"
+        return "Yes"
+    except (httpx.RequestError, httpx.HTTPStatusError):
+        return "Failed"
+
+# 合并的ChatGPT检测功能，三个请求互不依赖，并发执行
+async def check_chatgpt_combined(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> List[UnlockItem]:
+    async with use_http_client(proxy, client) as client:
+        region, ios_status, web_status = await asyncio.gather(
+            _fetch_chatgpt_region(client),
+            _check_chatgpt_ios_status(client),
+            _check_chatgpt_web_status(client),
+        )
+
+    return [
+        UnlockItem("ChatGPT iOS", ios_status, region=region),
+        UnlockItem("ChatGPT Web", web_status, region=region),
+    ]
 
 # 测试Gemini
-async def check_gemini(proxy: Optional[str] = None) -> UnlockItem:
+async def check_gemini(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://gemini.google.com"
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         status = "Failed"
         region = None
         try:
@@ -166,7 +225,7 @@ async def check_gemini(proxy: Optional[str] = None) -> UnlockItem:
             status = "Yes" if is_ok else "No"
             
             # 尝试提取国家代码
-            match = re.search(r',2,1,200,"([A-Z]{3})"', body)
+            match = _GEMINI_REGION_RE.search(body)
             if match:
                 country_code = match.group(1)
                 emoji = country_code_to_emoji(country_code)
@@ -182,9 +241,9 @@ async def check_gemini(proxy: Optional[str] = None) -> UnlockItem:
     return UnlockItem("Gemini", status, region=region)
 
 # 测试 YouTube Premium
-async def check_youtube_premium(proxy: Optional[str] = None) -> UnlockItem:
+async def check_youtube_premium(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://www.youtube.com/premium"
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         status = "Failed"
         region = None
         try:
@@ -202,7 +261,7 @@ async def check_youtube_premium(proxy: Optional[str] = None) -> UnlockItem:
                 status = "No"
             elif "ad-free" in body_lower:
                 status = "Yes"
-                match = re.search(r'id="country-code"[^>]*>([^<]+)<', body)
+                match = _YT_REGION_RE.search(body)
                 if match:
                     country_code = match.group(1).strip()
                     emoji = country_code_to_emoji(country_code)
@@ -218,16 +277,16 @@ async def check_youtube_premium(proxy: Optional[str] = None) -> UnlockItem:
 
 
 # 测试动画疯(Bahamut Anime)
-async def check_bahamut_anime(proxy: Optional[str] = None) -> UnlockItem:
+async def check_bahamut_anime(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     status = "Failed"
     region = None
     try:
-        # 使用独立的带Windows User-Agent的客户端
+        # 每个请求都带上Windows User-Agent
         custom_headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"}
-        async with create_http_client(proxy, custom_headers) as anime_client:
+        async with use_http_client(proxy, client) as anime_client:
             # 第一步：获取设备ID
             device_url = "https://ani.gamer.com.tw/ajax/getdeviceid.php"
-            device_id_res = await anime_client.get(device_url)
+            device_id_res = await anime_client.get(device_url, headers=custom_headers)
             device_id_res.raise_for_status()
             device_id_json = device_id_res.json()
             device_id = device_id_json.get("deviceid")
@@ -236,8 +295,16 @@ async def check_bahamut_anime(proxy: Optional[str] = None) -> UnlockItem:
                 return UnlockItem("Bahamut Anime", "Failed")
 
             # 第二步：使用设备ID检查访问权限
+            # 第三步：访问主页获取区域信息
+            # 主页不依赖 token 的结果，两个请求并发执行；主页结果仅在有访问权限时使用
             token_url = f"https://ani.gamer.com.tw/ajax/token.php?adID=89422&sn=37783&device={device_id}"
-            token_res = await anime_client.get(token_url)
+            token_res, main_page_res = await asyncio.gather(
+                anime_client.get(token_url, headers=custom_headers),
+                anime_client.get("https://ani.gamer.com.tw/", headers=custom_headers),
+                return_exceptions=True,
+            )
+            if isinstance(token_res, BaseException):
+                raise token_res
             token_res.raise_for_status()
             
             # 确保完整读取响应
@@ -245,11 +312,11 @@ async def check_bahamut_anime(proxy: Optional[str] = None) -> UnlockItem:
             if "animeSn" not in token_body:
                 return UnlockItem("Bahamut Anime", "No")
             
-            # 第三步：访问主页获取区域信息
-            main_page_res = await anime_client.get("https://ani.gamer.com.tw/")
+            if isinstance(main_page_res, BaseException):
+                raise main_page_res
             main_page_res.raise_for_status()
             body = main_page_res.text
-            match = re.search(r'data-geo="([^"]+)"', body)
+            match = _BAHAMUT_GEO_RE.search(body)
             if match:
                 country_code = match.group(1)
                 emoji = country_code_to_emoji(country_code)
@@ -264,21 +331,23 @@ async def check_bahamut_anime(proxy: Optional[str] = None) -> UnlockItem:
 
 
 # 使用Fast.com API检测Netflix CDN区域
-async def check_netflix_cdn(proxy: Optional[str] = None) -> UnlockItem:
+async def check_netflix_cdn(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://api.fast.com/netflix/speedtest/v2?https=true&token=YXNkZmFzZGxmbnNkYWZoYXNkZmhrYWxm&urlCount=5"
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         try:
-            response = await client.get(url, timeout=30)
+            response = await client.get(url)
             if response.status_code == 403:
                 return UnlockItem("Netflix", "No (IP Banned By Netflix)")
 
             response.raise_for_status()
             data = response.json()
-            targets = data.get("targets", [])
-            if targets:
-                location = targets[0].get("location", {})
-                country = location.get("country")
-                if country:
+            if not isinstance(data, dict):
+                return UnlockItem("Netflix", "Failed (CDN API: unexpected response)")
+            targets = data.get("targets")
+            if isinstance(targets, list) and targets and isinstance(targets[0], dict):
+                location = targets[0].get("location")
+                country = location.get("country") if isinstance(location, dict) else None
+                if isinstance(country, str) and country:
                     emoji = country_code_to_emoji(country)
                     return UnlockItem("Netflix", "Yes", region=f"{emoji}{country}")
 
@@ -288,18 +357,26 @@ async def check_netflix_cdn(proxy: Optional[str] = None) -> UnlockItem:
             return UnlockItem("Netflix", f"Failed (CDN API: {e})")
 
 # 测试 Netflix
-async def check_netflix(proxy: Optional[str] = None) -> UnlockItem:
-    cdn_result = await check_netflix_cdn(proxy)
-    if cdn_result.status == "Yes":
+async def check_netflix(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
+    cdn_result = await check_netflix_cdn(proxy, client)
+    # CDN 接口给出明确结论（可用或 IP 被封）时直接返回，仅在 Unknown/Failed 时再检测标题页
+    if cdn_result.status == "Yes" or cdn_result.status.startswith("No"):
         return cdn_result
 
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         url1 = "https://www.netflix.com/title/81280792"  # LEGO Ninjago
         url2 = "https://www.netflix.com/title/70143836"  # Breaking Bad
 
         try:
-            res1 = await client.get(url1, timeout=30, follow_redirects=True)
-            res2 = await client.get(url2, timeout=30, follow_redirects=True)
+            # 两个标题页互不依赖，并发请求；任一失败按原逻辑抛出
+            res1, res2 = await asyncio.gather(
+                client.get(url1, follow_redirects=True),
+                client.get(url2, follow_redirects=True),
+                return_exceptions=True,
+            )
+            for res in (res1, res2):
+                if isinstance(res, BaseException):
+                    raise res
             
             status1 = res1.status_code
             status2 = res2.status_code
@@ -313,12 +390,12 @@ async def check_netflix(proxy: Optional[str] = None) -> UnlockItem:
             if status1 in [200, 301, 302] or status2 in [200, 301, 302]:
                 test_url = "https://www.netflix.com/title/80018499"
                 try:
-                    test_res = await client.get(test_url, timeout=30, follow_redirects=False) # Do not follow redirects to get location
+                    test_res = await client.get(test_url, follow_redirects=False) # Do not follow redirects to get location
                     if 'location' in test_res.headers:
-                        location_str = test_res.headers['location']
-                        parts = location_str.split('/')
-                        if len(parts) >= 4:
-                            region_code = parts[3].split('-')[0]
+                        # 跳转地址形如 https://www.netflix.com/jp/title/...，路径第一段即地区（可能带语言后缀，如 jp-en）
+                        first_segment = urlsplit(test_res.headers['location']).path.lstrip('/').partition('/')[0]
+                        region_code = first_segment.partition('-')[0]
+                        if region_code:
                             emoji = country_code_to_emoji(region_code)
                             return UnlockItem("Netflix", "Yes", region=f"{emoji}{region_code.upper()}")
                 except httpx.RequestError:
@@ -333,9 +410,9 @@ async def check_netflix(proxy: Optional[str] = None) -> UnlockItem:
             return UnlockItem("Netflix", f"Failed (Request Error: {e})")
 
 # 测试 Disney+
-async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
+async def check_disney_plus(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     auth_header = "Bearer ZGlzbmV5JmJyb3dzZXImMS4wLjA.Cu56AgSfBTDag5NiRA81oLHkDZfu5L3CKadnefEAY84"
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         try:
             # Step 1: Get assertion
             device_api_url = "https://disney.api.edge.bamgrid.com/devices"
@@ -385,7 +462,14 @@ async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
                 "query": "mutation refreshToken($input: RefreshTokenInput!) { refreshToken(refreshToken: $input) { activeSession { sessionId } } }",
                 "variables": {"input": {"refreshToken": refresh_token}}
             }
-            res_graphql = await client.post(graphql_url, json=graphql_payload, headers={"authorization": auth_header})
+            # 预览页检测只依赖网络出口，与 GraphQL 并发请求；其结果仅在需要时使用
+            res_graphql, res_preview = await asyncio.gather(
+                client.post(graphql_url, json=graphql_payload, headers={"authorization": auth_header}),
+                client.get("https://disneyplus.com"),
+                return_exceptions=True,
+            )
+            if isinstance(res_graphql, BaseException):
+                raise res_graphql
             
             # 确保完整读取GraphQL响应
             graphql_body_text = res_graphql.text
@@ -396,7 +480,7 @@ async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
                     res_main = await client.get("https://www.disneyplus.com/")
                     res_main.raise_for_status()
                     body_main = res_main.text
-                    match_main = re.search(r'"region"\s*:\s*"([^"]+)"', body_main)
+                    match_main = _DISNEY_REGION_RE.search(body_main)
                     if match_main:
                         region = match_main.group(1)
                         emoji = country_code_to_emoji(region)
@@ -405,7 +489,7 @@ async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
                     pass
                 return UnlockItem("Disney+", f"Failed (GraphQL error: {res_graphql.status_code})")
 
-            match_country = re.search(r'"countryCode"\s*:\s*"([^"]+)"', graphql_body_text)
+            match_country = _DISNEY_COUNTRY_RE.search(graphql_body_text)
             region = match_country.group(1) if match_country else None
 
             if not region:
@@ -415,11 +499,13 @@ async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
                 emoji = country_code_to_emoji("JP")
                 return UnlockItem("Disney+", "Yes", region=f"{emoji}JP")
 
-            match_supported = re.search(r'"inSupportedLocation"\s*:\s*(true|false)', graphql_body_text)
+            match_supported = _DISNEY_SUPPORTED_RE.search(graphql_body_text)
             in_supported_location = match_supported and match_supported.group(1) == "true"
             
-            res_preview = await client.get("https://disneyplus.com")
-            is_unavailable = "preview" in str(res_preview.url) or "unavailable" in str(res_preview.url)
+            if isinstance(res_preview, BaseException):
+                raise res_preview
+            preview_url = str(res_preview.url)
+            is_unavailable = "preview" in preview_url or "unavailable" in preview_url
             
             if is_unavailable:
                 return UnlockItem("Disney+", "No")
@@ -434,9 +520,9 @@ async def check_disney_plus(proxy: Optional[str] = None) -> UnlockItem:
             return UnlockItem("Disney+", f"Failed (Error: {e})")
 
 # 测试 Amazon Prime Video
-async def check_prime_video(proxy: Optional[str] = None) -> UnlockItem:
+async def check_prime_video(proxy: Optional[str] = None, client: Optional[httpx.AsyncClient] = None) -> UnlockItem:
     url = "https://www.primevideo.com"
-    async with create_http_client(proxy) as client:
+    async with use_http_client(proxy, client) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -449,9 +535,8 @@ async def check_prime_video(proxy: Optional[str] = None) -> UnlockItem:
             if "isServiceRestricted" in body:
                 return UnlockItem("Prime Video", "No (Service Not Available)")
 
-            match_region = re.search(r'"currentTerritory":"([^"]+)"', body)
-            if match_region:
-                region = match_region.group(1)
+            region = _extract_between(body, '"currentTerritory":"')
+            if region:
                 emoji = country_code_to_emoji(region)
                 return UnlockItem("Prime Video", "Yes", region=f"{emoji}{region}")
             
@@ -463,36 +548,48 @@ async def check_prime_video(proxy: Optional[str] = None) -> UnlockItem:
             return UnlockItem("Prime Video", f"Failed (Network: {str(e)[:50]})")
 
 
+async def _run_check(coro, names: Tuple[str, ...]) -> List[UnlockItem]:
+    """在总时限内执行一项检测，超时或出现未处理的异常时为该检测涉及的每个服务生成失败结果"""
+    try:
+        result = await asyncio.wait_for(coro, timeout=CHECK_DEADLINE)
+    except TimeoutError:
+        return [UnlockItem(name, "Failed (Timeout)") for name in names]
+    except Exception as e:
+        # 单项检测的意外异常不应中断 gather 中的其他检测
+        return [UnlockItem(name, f"Failed (Error: {str(e)[:50]})") for name in names]
+    return result if isinstance(result, list) else [result]
+
+
 async def main(proxy: Optional[str]):
-    # 每个检测函数现在都使用独立的客户端
-    tasks = [
-        check_bilibili_china_mainland(proxy),
-        check_bilibili_hk_mc_tw(proxy),
-        check_chatgpt_combined(proxy),
-        check_gemini(proxy),
-        check_youtube_premium(proxy),
-        check_bahamut_anime(proxy),
-        check_netflix(proxy),
-        check_disney_plus(proxy),
-        check_prime_video(proxy),
-    ]
-    
-    results = await asyncio.gather(*tasks)
+    # 任务创建时立即执行到第一次真正挂起，提前完成的检测无需再经过一轮调度
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    # 所有检测共用一个客户端，复用连接池
+    async with create_http_client(proxy) as client:
+        tasks = [
+            _run_check(check_bilibili_china_mainland(proxy, client), ("哔哩哔哩大陆",)),
+            _run_check(check_bilibili_hk_mc_tw(proxy, client), ("哔哩哔哩港澳台",)),
+            _run_check(check_chatgpt_combined(proxy, client), ("ChatGPT iOS", "ChatGPT Web")),
+            _run_check(check_gemini(proxy, client), ("Gemini",)),
+            _run_check(check_youtube_premium(proxy, client), ("Youtube Premium",)),
+            _run_check(check_bahamut_anime(proxy, client), ("Bahamut Anime",)),
+            _run_check(check_netflix(proxy, client), ("Netflix",)),
+            _run_check(check_disney_plus(proxy, client), ("Disney+",)),
+            _run_check(check_prime_video(proxy, client), ("Prime Video",)),
+        ]
+
+        results = await asyncio.gather(*tasks)
     
     final_results = []
     for result in results:
-        if isinstance(result, list):
-            final_results.extend([item.to_dict() for item in result])
-        else:
-            final_results.append(result.to_dict())
+        final_results.extend(result)
             
-    # 打印结果
-    import json
-    print(json.dumps(final_results, indent=2, ensure_ascii=False))
+    # 打印结果，UnlockItem 在序列化时才转换为字典
+    print(json.dumps(final_results, indent=2, ensure_ascii=False, default=UnlockItem.to_dict))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run unlock tests for various streaming services.')
     parser.add_argument('--proxy', type=str, default='http://127.0.0.1:7890', help='Proxy to use for the requests, e.g., http://127.0.0.1:7890')
     args = parser.parse_args()
     
-    asyncio.run(main(args.proxy))
+    # 事件循环的选择与主程序一致（安装了 uvloop 时使用它）
+    asyncio.run(main(args.proxy), loop_factory=get_loop_factory())